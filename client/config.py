@@ -3,11 +3,74 @@ Configuration module for Claude On The Beach
 Centralizes all constants, settings, and configuration values
 """
 
+import functools
 import os
+import re
 from typing import Optional
 
 
-class Config:
+def _compile_alternation(patterns):
+    """Compile one case-insensitive alternation over a pattern list
+
+    Consumers used to walk these lists with per-pattern substring checks on
+    every screenshot pass; a single compiled alternation does the same
+    match in one C-level scan.
+    """
+    return re.compile('|'.join(map(re.escape, patterns)), re.IGNORECASE)
+
+
+# Builders for the compiled matchers, keyed by the attribute name they
+# back. Compilation is the expensive part of loading this module, so it
+# is deferred until a matcher is first touched - a short-lived invocation
+# (e.g. the platform check failing and exiting) never pays for it.
+_LAZY_MATCHERS = {
+    'STATUS_WORDS_RE':
+        lambda cls: _compile_alternation(cls.STATUS_WORDS),
+    'RUNNING_INDICATORS_RE':
+        lambda cls: _compile_alternation(cls.RUNNING_INDICATORS),
+    'COMPLETION_INDICATORS_RE':
+        lambda cls: _compile_alternation(cls.COMPLETION_INDICATORS),
+    'STRONG_COMPLETION_RE':
+        lambda cls: _compile_alternation(cls.STRONG_COMPLETION_INDICATORS),
+    'WEAK_COMPLETION_RE':
+        lambda cls: _compile_alternation(cls.WEAK_COMPLETION_INDICATORS),
+    'TASK_COMPLETION_RES':
+        lambda cls: {task: _compile_alternation(patterns)
+                     for task, patterns in cls.TASK_COMPLETION_PATTERNS.items()},
+    'QUESTION_DETECTION_RES':
+        lambda cls: {category: _compile_alternation(patterns)
+                     for category, patterns in cls.QUESTION_DETECTION_PATTERNS.items()},
+    # All question categories folded into one alternation with a named
+    # group per category, so classification is a single scan instead of
+    # six. Dict order puts the higher-confidence tiers first at
+    # overlapping matches.
+    'QUESTION_DETECTION_COMBINED_RE':
+        lambda cls: re.compile(
+            '|'.join('(?P<%s>%s)' % (category, '|'.join(map(re.escape, patterns)))
+                     for category, patterns in cls.QUESTION_DETECTION_PATTERNS.items()),
+            re.IGNORECASE),
+}
+
+
+class _LazyMatcherMeta(type):
+    """Build and memoize the compiled matchers on first access
+
+    The first read of e.g. Config.STATUS_WORDS_RE lands here, compiles
+    the matcher and stores it on the class; every later read is a plain
+    attribute hit.
+    """
+
+    def __getattr__(cls, name):
+        try:
+            builder = _LAZY_MATCHERS[name]
+        except KeyError:
+            raise AttributeError(name) from None
+        value = builder(cls)
+        setattr(cls, name, value)
+        return value
+
+
+class Config(metaclass=_LazyMatcherMeta):
     """Centralized configuration for the application"""
     
     # Monitoring intervals (seconds)
@@ -28,6 +91,9 @@ class Config:
     
     # LLM settings
     LLM_MODEL = "claude-3-5-sonnet-20241022"
+    # Cheaper/faster model for binary classifiers (input checks, command
+    # verification) where Sonnet-level reasoning isn't needed
+    LLM_FAST_MODEL = "claude-3-5-haiku-20241022"
     LLM_MAX_TOKENS = 200
     
     # File paths
@@ -151,17 +217,25 @@ class Config:
         'waiting for input', 'prompt', '>', 'command line'
     ]
     
+    # The env getters are cached on first call rather than resolved at
+    # import: the CLI writes SERVER_URL into os.environ during argument
+    # parsing, and nothing mutates these after startup, so later reads
+    # shouldn't keep hitting os.environ.
+
     @classmethod
+    @functools.lru_cache(maxsize=None)
     def get_server_url(cls) -> str:
         """Get WebSocket server URL from environment or default"""
         return os.getenv('SERVER_URL', cls.DEFAULT_SERVER_URL)
-    
+
     @classmethod
+    @functools.lru_cache(maxsize=None)
     def get_screenshots_folder(cls) -> Optional[str]:
         """Get screenshots folder from environment"""
         return os.getenv('SCREENSHOTS_FOLDER')
-    
+
     @classmethod
+    @functools.lru_cache(maxsize=None)
     def get_start_directory(cls) -> Optional[str]:
         """Get start directory from environment"""
         return os.getenv('START_DIRECTORY')
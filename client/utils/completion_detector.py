@@ -114,30 +114,17 @@ class CompletionDetector:
         """Check for strong completion indicators that override other detection"""
         from config import Config
         
-        found_indicators = []
-        text_lower = text.lower()
-        
-        for indicator in Config.STRONG_COMPLETION_INDICATORS:
-            if indicator.lower() in text_lower:
-                found_indicators.append(indicator)
-        
-        return found_indicators
+        # One pass over the text via the precompiled alternation
+        return Config.STRONG_COMPLETION_RE.findall(text)
     
     def _check_task_specific_completion(self, text: str, task_type: str) -> List[str]:
         """Check for task-specific completion patterns"""
         from config import Config
         
-        if task_type not in Config.TASK_COMPLETION_PATTERNS:
+        task_re = Config.TASK_COMPLETION_RES.get(task_type)
+        if task_re is None:
             return []
-        
-        found_indicators = []
-        text_lower = text.lower()
-        
-        for pattern in Config.TASK_COMPLETION_PATTERNS[task_type]:
-            if pattern.lower() in text_lower:
-                found_indicators.append(pattern)
-        
-        return found_indicators
+        return task_re.findall(text)
     
     def _validate_llm_completion(self, text: str, status_info: Dict[str, Any]) -> Dict[str, Any]:
         """Validate LLM completion decision with additional checks"""
@@ -145,18 +132,10 @@ class CompletionDetector:
         
         # Check if LLM marked as complete but we see active indicators
         if status_info.get('is_complete', False):
-            # Look for contradicting active indicators
-            active_indicators = []
-            
-            # Check for status words
-            for status_word in Config.STATUS_WORDS:
-                if status_word.lower() in text.lower():
-                    active_indicators.append(status_word)
-            
-            # Check for running indicators
-            for running_indicator in Config.RUNNING_INDICATORS:
-                if running_indicator.lower() in text.lower():
-                    active_indicators.append(running_indicator)
+            # Look for contradicting active indicators - precompiled
+            # alternations instead of nested substring loops
+            active_indicators = (Config.STATUS_WORDS_RE.findall(text)
+                                 + Config.RUNNING_INDICATORS_RE.findall(text))
             
             # Check for ESC interrupt pattern
             if Config.ESC_INTERRUPT_PATTERN.lower() in text.lower():
@@ -183,14 +162,7 @@ class CompletionDetector:
         """Check for weak completion indicators"""
         from config import Config
         
-        found_indicators = []
-        text_lower = text.lower()
-        
-        for indicator in Config.WEAK_COMPLETION_INDICATORS:
-            if indicator.lower() in text_lower:
-                found_indicators.append(indicator)
-        
-        return found_indicators
+        return Config.WEAK_COMPLETION_RE.findall(text)
     
     def _confirm_weak_completion(self) -> bool:
         """Confirm weak completion with timing and consistency checks"""
@@ -16,89 +16,65 @@ import os
 sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 from config import Config
 
+# SIMD base64 (SSSE3/AVX2) for the screenshot payloads, stdlib fallback
+try:
+    import pybase64
+    PYBASE64_AVAILABLE = True
+except ImportError:
+    PYBASE64_AVAILABLE = False
+
+
+def _b64encode_str(data) -> str:
+    """base64-encode a bytes-like object to str, via pybase64 when available"""
+    if PYBASE64_AVAILABLE:
+        return pybase64.b64encode_as_string(data)
+    return base64.b64encode(data).decode()
+
+# Forced tool call - the schema pins the response shape, so parse failures
+# (and their conservative "still running" fallback) can't mask completion
+_REPORT_TERMINAL_STATE_TOOL = {
+    "name": "report_terminal_state",
+    "description": "Report the analyzed state of the terminal screenshot(s)",
+    "input_schema": {
+        "type": "object",
+        "properties": {
+            "status": {"type": "string",
+                       "description": "Brief description of the current activity, under 50 characters"},
+            "needs_input": {"type": "boolean"},
+            "is_complete": {"type": "boolean"},
+            "question": {"type": "string",
+                         "description": "The question being asked, if needs_input is true"},
+            "screenshots_match": {"type": "boolean",
+                                  "description": "True when the two screenshots are identical or very similar"}
+        },
+        "required": ["status", "needs_input", "is_complete"]
+    }
+}
+
+
+# Batched variant of the tool above: one call reports the state of several
+# screenshot-pairs queued up during a long-running, non-interactive phase
+_REPORT_TERMINAL_STATES_BATCH_TOOL = {
+    "name": "report_terminal_states",
+    "description": "Report the analyzed state of each indexed screenshot-pair",
+    "input_schema": {
+        "type": "object",
+        "properties": {
+            "states": {
+                "type": "array",
+                "description": "One state per screenshot-pair, in index order",
+                "items": _REPORT_TERMINAL_STATE_TOOL["input_schema"]
+            }
+        },
+        "required": ["states"]
+    }
+}
 
-class LLMAnalyzer:
-    """Handles LLM-based analysis of terminal screenshots"""
-    
-    def __init__(self, claude_client):
-        self.claude_client = claude_client
-    
-    async def analyze_screenshot_with_llm(
-        self, 
-        screenshot: Image.Image, 
-        second_screenshot: Optional[Image.Image] = None
-    ) -> Dict[str, Any]:
-        """
-        Analyze screenshot with Claude API to understand terminal state
-        
-        Args:
-            screenshot: Primary screenshot to analyze
-            second_screenshot: Optional second screenshot for dual analysis
-            
-        Returns:
-            Dictionary with analysis results
-        """
-        if not self.claude_client:
-            return self._fallback_analysis()
-        
-        try:
-            # Convert PIL image to base64
-            buffer = io.BytesIO()
-            screenshot.save(buffer, format='PNG')
-            img_base64 = base64.b64encode(buffer.getvalue()).decode()
-            
-            # Prepare content for Claude API
-            content = [
-                {
-                    "type": "image",
-                    "source": {
-                        "type": "base64",
-                        "media_type": "image/png",
-                        "data": img_base64
-                    }
-                }
-            ]
-            
-            # If we have a second screenshot, add it for comparison
-            if second_screenshot:
-                buffer2 = io.BytesIO()
-                second_screenshot.save(buffer2, format='PNG')
-                img_base64_2 = base64.b64encode(buffer2.getvalue()).decode()
-                
-                content.append({
-                    "type": "image",
-                    "source": {
-                        "type": "base64",
-                        "media_type": "image/png",
-                        "data": img_base64_2
-                    }
-                })
-                
-                prompt = self._get_dual_screenshot_prompt()
-            else:
-                prompt = self._get_single_screenshot_prompt()
-            
-            response = await asyncio.get_event_loop().run_in_executor(
-                None, 
-                lambda: self.claude_client.messages.create(
-                    model=Config.LLM_MODEL,
-                    max_tokens=Config.LLM_MAX_TOKENS,
-                    messages=[{
-                        "role": "user",
-                        "content": content + [{"type": "text", "text": prompt}]
-                    }]
-                )
-            )
-            
-            return self._parse_llm_response(response)
-            
-        except Exception as e:
-            print(f"⚠️ Claude API analysis failed: {e}")
-            return self._fallback_analysis()
-    
-    def _get_dual_screenshot_prompt(self) -> str:
-        """Get prompt for dual screenshot analysis"""
-        return f"""Analyze these two terminal screenshots taken 100ms apart and respond with a JSON object containing:
+
+# Prompt templates built once at import - Config values are constants, and
+# a byte-identical prefix on every call is what keeps the Anthropic prompt
+# cache hitting (any whitespace drift would defeat it)
+_PROMPT_DUAL = f"""Analyze these two terminal screenshots taken 100ms apart and respond with a JSON object containing:
 
 1. "status": Brief description of what's happening (e.g., "Installing npm packages", "File edit confirmation", "Ready for input")
 2. "needs_input": true if waiting for user input/response, false otherwise  
@@ -144,17 +120,9 @@ IMPORTANT: Pay special attention to:
 
 Look for signs of active processing (progress bars, "installing...", loading indicators, "{Config.ESC_INTERRUPT_PATTERN}") vs. waiting for input (selection menus, confirmation dialogs, numbered choices).
 
-Keep status under 50 characters. Set needs_input=true if you see any selection prompt or question.
+Keep status under 50 characters. Set needs_input=true if you see any selection prompt or question."""
 
-Examples:
-{{"status": "Installing dependencies", "needs_input": false, "is_complete": false, "question": null, "screenshots_match": false}}
-{{"status": "File edit confirmation", "needs_input": true, "is_complete": false, "question": "Do you want to make this edit to hello.py?", "screenshots_match": true}}
-{{"status": "Choose framework option", "needs_input": true, "is_complete": false, "question": "React or Vue? (R/V)", "screenshots_match": true}}
-{{"status": "Ready for input", "needs_input": false, "is_complete": true, "question": null, "screenshots_match": true}}"""
-    
-    def _get_single_screenshot_prompt(self) -> str:
-        """Get prompt for single screenshot analysis"""
-        return f"""Analyze this terminal screenshot and respond with a JSON object containing:
+_PROMPT_SINGLE = f"""Analyze this terminal screenshot and respond with a JSON object containing:
 
 1. "status": Brief description of what's happening (e.g., "Installing npm packages", "File edit confirmation", "Ready for input")
 2. "needs_input": true if waiting for user input/response, false otherwise  
@@ -189,45 +157,194 @@ IMPORTANT: Pay special attention to:
 
 Look for signs of active processing (progress bars, "installing...", loading indicators, "{Config.ESC_INTERRUPT_PATTERN}") vs. waiting for input (selection menus, confirmation dialogs, numbered choices).
 
-Keep status under 50 characters. Set needs_input=true if you see any selection prompt or question.
+Keep status under 50 characters. Set needs_input=true if you see any selection prompt or question."""
 
-Examples:
-{{"status": "Installing dependencies", "needs_input": false, "is_complete": false, "question": null}}
-{{"status": "File edit confirmation", "needs_input": true, "is_complete": false, "question": "Do you want to make this edit to hello.py?"}}
-{{"status": "Choose framework option", "needs_input": true, "is_complete": false, "question": "React or Vue? (R/V)"}}
-{{"status": "Model switch detected", "needs_input": false, "is_complete": true, "question": null}}
-{{"status": "Ready for input", "needs_input": false, "is_complete": true, "question": null}}"""
+_PROMPT_DUAL_BLOCK = {"type": "text", "text": _PROMPT_DUAL,
+                      "cache_control": {"type": "ephemeral"}}
+_PROMPT_SINGLE_BLOCK = {"type": "text", "text": _PROMPT_SINGLE,
+                        "cache_control": {"type": "ephemeral"}}
+
+# Skeleton for API image blocks - copied per call with only the payload
+# filled in, matching the main client's template
+_IMAGE_BLOCK_TEMPLATE = {
+    "type": "image",
+    "source": {"type": "base64", "media_type": "image/jpeg", "data": None}
+}
+
+class LLMAnalyzer:
+    """Handles LLM-based analysis of terminal screenshots"""
     
-    def _parse_llm_response(self, response) -> Dict[str, Any]:
-        """Parse Claude's response and extract JSON"""
-        response_text = response.content[0].text.strip()
-        print(f"🧠 Raw Claude response: {response_text}")
-        
-        # Extract JSON from response (Claude might add explanation)
-        json_match = re.search(r'\{[^{}]*(?:\{[^{}]*\}[^{}]*)*\}', response_text)
-        if json_match:
-            json_text = json_match.group()
-            try:
-                analysis = json.loads(json_text)
-            except json.JSONDecodeError:
-                # Try a more greedy match for nested JSON
-                json_match = re.search(r'\{.*?\}', response_text, re.DOTALL)
-                if json_match:
-                    analysis = json.loads(json_match.group())
-                else:
-                    raise ValueError("No valid JSON found in response")
-        else:
-            raise ValueError("No JSON object found in response")
+    def __init__(self, claude_client):
+        self.claude_client = claude_client
+
+    @staticmethod
+    def _encode_for_vision(screenshot: Image.Image) -> Dict[str, Any]:
+        """Downscale and JPEG-encode a screenshot as an API image block
+
+        Full-resolution Retina captures are several megapixels and dominate
+        both the latency and token cost of each vision call. ~1024px is
+        plenty for Claude to read terminal text, and JPEG is 5-10x smaller
+        than PNG for anti-aliased terminal output.
+        """
+        img = screenshot.copy()  # thumbnail() resizes in place
+        img.thumbnail((1024, 1024), Image.LANCZOS)
+        if img.mode not in ('RGB', 'L'):
+            img = img.convert('RGB')  # JPEG has no alpha
+        buffer = io.BytesIO()
+        img.save(buffer, format='JPEG', quality=75)
+        block = _IMAGE_BLOCK_TEMPLATE.copy()
+        source = _IMAGE_BLOCK_TEMPLATE["source"].copy()
+        source["data"] = _b64encode_str(buffer.getbuffer())
+        block["source"] = source
+        return block
+
+    async def analyze_screenshot_with_llm(
+        self, 
+        screenshot: Image.Image, 
+        second_screenshot: Optional[Image.Image] = None
+    ) -> Dict[str, Any]:
+        """
+        Analyze screenshot with Claude API to understand terminal state
         
-        # Validate required keys
-        required_keys = ['status', 'needs_input', 'is_complete', 'question']
-        if not all(key in analysis for key in required_keys):
-            raise ValueError("Missing required keys in analysis")
+        Args:
+            screenshot: Primary screenshot to analyze
+            second_screenshot: Optional second screenshot for dual analysis
+            
+        Returns:
+            Dictionary with analysis results
+        """
+        if not self.claude_client:
+            return self._fallback_analysis()
         
-        # Add screenshots_match if not present (for backward compatibility)
+        try:
+            # Prepare content for Claude API - the resize + JPEG pass is
+            # CPU-bound, so run it on worker threads to keep heartbeats and
+            # command handling responsive; in dual mode the two encodes are
+            # independent, so they overlap
+            if second_screenshot:
+                content = list(await asyncio.gather(
+                    asyncio.to_thread(self._encode_for_vision, screenshot),
+                    asyncio.to_thread(self._encode_for_vision, second_screenshot)))
+                prompt_block = _PROMPT_DUAL_BLOCK
+            else:
+                content = [await asyncio.to_thread(self._encode_for_vision, screenshot)]
+                prompt_block = _PROMPT_SINGLE_BLOCK
+            
+            # Static prompt first, marked for Anthropic prompt caching - the
+            # monitor re-sends the same instructions every few seconds, so
+            # repeat calls only pay for the image tokens. The async client
+            # awaits natively - no thread hop per call.
+            response = await self.claude_client.messages.create(
+                model=Config.LLM_MODEL,
+                max_tokens=Config.LLM_MAX_TOKENS,
+                tools=[_REPORT_TERMINAL_STATE_TOOL],
+                tool_choice={"type": "tool", "name": "report_terminal_state"},
+                messages=[{
+                    "role": "user",
+                    "content": [prompt_block] + content
+                }]
+            )
+            
+            return self._parse_llm_response(response)
+            
+        except Exception as e:
+            print(f"⚠️ Claude API analysis failed: {e}")
+            return self._fallback_analysis()
+    
+    async def analyze_screenshot_batch(self, pairs) -> list:
+        """Analyze several queued screenshot-pairs with one Claude call
+
+        During long installs/builds the monitor queues observations instead
+        of paying one API round-trip per poll; this sends the whole queue
+        as indexed image pairs and gets back one state per pair. The last
+        state drives the monitoring loop, the earlier ones are history.
+
+        Args:
+            pairs: List of (screenshot, second_screenshot) tuples
+
+        Returns:
+            List of analysis dicts, one per pair and in the same order
+        """
+        if len(pairs) == 1:
+            return [await self.analyze_screenshot_with_llm(pairs[0][0], pairs[0][1])]
+
+        if not self.claude_client:
+            return [self._fallback_analysis() for _ in pairs]
+
+        try:
+            # Encode every frame concurrently on worker threads
+            flat = [frame for pair in pairs for frame in pair if frame is not None]
+            encoded = await asyncio.gather(
+                *[asyncio.to_thread(self._encode_for_vision, frame) for frame in flat])
+            encoded = list(encoded)
+
+            content = []
+            for i, pair in enumerate(pairs):
+                content.append({"type": "text", "text": f"[{i + 1}]"})
+                content.append(encoded.pop(0))
+                if pair[1] is not None:
+                    content.append(encoded.pop(0))
+
+            prompt = (
+                f"You will see {len(pairs)} screenshot-pairs of the same terminal, "
+                f"labeled [1] through [{len(pairs)}] in chronological order. Each pair "
+                "was taken 100ms apart. For EACH pair, independently apply the rules "
+                "below and report one state; return the states in index order.\n\n"
+                + self._get_dual_screenshot_prompt())
+
+            response = await self.claude_client.messages.create(
+                model=Config.LLM_MODEL,
+                max_tokens=Config.LLM_MAX_TOKENS * len(pairs),
+                tools=[_REPORT_TERMINAL_STATES_BATCH_TOOL],
+                tool_choice={"type": "tool", "name": "report_terminal_states"},
+                messages=[{
+                    "role": "user",
+                    "content": [{"type": "text", "text": prompt,
+                                 "cache_control": {"type": "ephemeral"}}] + content
+                }]
+            )
+
+            states = None
+            for block in response.content:
+                if getattr(block, 'type', None) == 'tool_use':
+                    states = [dict(state) for state in block.input.get('states', [])]
+                    break
+            if not states:
+                raise ValueError("No states in batch response")
+
+            for state in states:
+                state.setdefault('question', None)
+                state.setdefault('screenshots_match', True)
+            print(f"🧠 Claude batch analysis ({len(states)} states): {states[-1]['status']}")
+            return states
+
+        except Exception as e:
+            print(f"⚠️ Batch analysis failed, falling back to latest pair: {e}")
+            return [await self.analyze_screenshot_with_llm(pairs[-1][0], pairs[-1][1])]
+
+    def _get_dual_screenshot_prompt(self) -> str:
+        """Get prompt for dual screenshot analysis"""
+        return _PROMPT_DUAL
+    
+    def _get_single_screenshot_prompt(self) -> str:
+        """Get prompt for single screenshot analysis"""
+        return _PROMPT_SINGLE
+    
+    def _parse_llm_response(self, response) -> Dict[str, Any]:
+        """Read the analysis dict off the forced tool call"""
+        analysis = None
+        for block in response.content:
+            if getattr(block, 'type', None) == 'tool_use':
+                analysis = dict(block.input)
+                break
+        if analysis is None:
+            raise ValueError("No tool_use block in response")
+
+        # Fill optional fields the schema doesn't force
+        analysis.setdefault('question', None)
         if 'screenshots_match' not in analysis:
             analysis['screenshots_match'] = True  # Assume static for single screenshot
-        
+
         print(f"🧠 Claude analysis: {analysis['status']}")
         return analysis
     
@@ -255,7 +372,7 @@ Examples:
         status_lower = status_info.get('status', '').lower()
         
         # Check for completion indicators (model switching, etc.)
-        if any(completion_indicator in status_lower for completion_indicator in Config.COMPLETION_INDICATORS):
+        if Config.COMPLETION_INDICATORS_RE.search(status_lower):
             print(f"✅ Override: Found completion indicator - IS complete")
             status_info['is_complete'] = True
             status_info['status'] = "Task completed (model switch detected)"
@@ -267,11 +384,11 @@ Examples:
                 print(f"⚠️ Override: Found '{Config.ESC_INTERRUPT_PATTERN}' - NOT complete")
                 status_info['is_complete'] = False
                 status_info['status'] = "Still processing"
-            elif any(status_word in status_lower for status_word in Config.STATUS_WORDS):
+            elif Config.STATUS_WORDS_RE.search(status_lower):
                 print(f"⚠️ Override: Found status message - NOT complete")
                 status_info['is_complete'] = False
                 status_info['status'] = "Still processing"
-            elif any(running_indicator in status_lower for running_indicator in Config.RUNNING_INDICATORS):
+            elif Config.RUNNING_INDICATORS_RE.search(status_lower):
                 print(f"⚠️ Override: Found running indicator - NOT complete")
                 status_info['is_complete'] = False
                 status_info['status'] = "Still processing"
@@ -56,46 +56,32 @@ class QuestionDetector:
         max_confidence = 0.0
         detected_type = "unknown"
         
-        # Check high confidence patterns
-        for pattern in Config.QUESTION_DETECTION_PATTERNS['high_confidence']:
-            if pattern in question_lower:
-                max_confidence = max(max_confidence, 0.95)
-                detected_type = "high_confidence"
-                break
-        
-        # Check medium confidence patterns
-        if max_confidence < 0.95:
-            for pattern in Config.QUESTION_DETECTION_PATTERNS['medium_confidence']:
-                if pattern in question_lower:
-                    max_confidence = max(max_confidence, 0.85)
-                    detected_type = "medium_confidence"
-                    break
-        
-        # Check low confidence patterns
-        if max_confidence < 0.85:
-            for pattern in Config.QUESTION_DETECTION_PATTERNS['low_confidence']:
-                if pattern in question_lower:
-                    max_confidence = max(max_confidence, 0.70)
-                    detected_type = "low_confidence"
-                    break
-        
-        # Check specialized patterns
-        for pattern_type, patterns in Config.QUESTION_DETECTION_PATTERNS.items():
-            if pattern_type in ['high_confidence', 'medium_confidence', 'low_confidence']:
-                continue
-            
-            for pattern in patterns:
-                if pattern in question_lower:
-                    if pattern_type == 'file_operations':
-                        max_confidence = max(max_confidence, 0.90)
-                        detected_type = "file_operation"
-                    elif pattern_type == 'permissions':
-                        max_confidence = max(max_confidence, 0.88)
-                        detected_type = "permission"
-                    elif pattern_type == 'configuration':
-                        max_confidence = max(max_confidence, 0.85)
-                        detected_type = "configuration"
-                    break
+        # One pass over the text: the combined alternation tags every hit
+        # with its category via named groups, instead of six separate scans
+        matched = {m.lastgroup for m in
+                   Config.QUESTION_DETECTION_COMBINED_RE.finditer(question_lower)}
+
+        # Confidence tiers (highest wins)
+        if 'high_confidence' in matched:
+            max_confidence = 0.95
+            detected_type = "high_confidence"
+        elif 'medium_confidence' in matched:
+            max_confidence = 0.85
+            detected_type = "medium_confidence"
+        elif 'low_confidence' in matched:
+            max_confidence = 0.70
+            detected_type = "low_confidence"
+
+        # Specialized categories override the generic tiers
+        if 'file_operations' in matched:
+            max_confidence = max(max_confidence, 0.90)
+            detected_type = "file_operation"
+        if 'permissions' in matched:
+            max_confidence = max(max_confidence, 0.88)
+            detected_type = "permission"
+        if 'configuration' in matched:
+            max_confidence = max(max_confidence, 0.85)
+            detected_type = "configuration"
         
         # Check for question marks and other punctuation
         if '?' in question_text:
@@ -235,12 +221,11 @@ class QuestionDetector:
         number_patterns = re.findall(r'\b\d+\b', text)
         patterns.update(number_patterns)
         
-        # Extract key phrases
-        for pattern_type, pattern_list in Config.QUESTION_DETECTION_PATTERNS.items():
-            for pattern in pattern_list:
-                if pattern in text:
-                    patterns.add(pattern)
-        
+        # Extract key phrases - one scan per category via the precompiled
+        # alternations instead of ~70 substring checks
+        for category_re in Config.QUESTION_DETECTION_RES.values():
+            patterns.update(category_re.findall(text))
+
         return patterns
     
     def _semantic_similarity(self, q1: str, q2: str) -> float:
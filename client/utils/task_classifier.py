@@ -52,18 +52,35 @@ class TaskClassifier:
         self.compiled_patterns = {}
         for task_type, patterns in self.task_patterns.items():
             self.compiled_patterns[task_type] = [re.compile(pattern, re.IGNORECASE) for pattern in patterns]
-    
+
+        # Memo of command -> task type: the monitor re-classifies the same
+        # command string every poll, so score the patterns once per command
+        self._classify_cache = {}
+
     def classify_task(self, command: str, context: Dict[str, Any] = None) -> str:
         """
         Classify the type of task based on command and context
-        
+
         Args:
             command: The command being executed
             context: Additional context (e.g., previous commands, file types)
-            
+
         Returns:
             Task type string or 'unknown'
         """
+        if context is not None:
+            return self._classify_uncached(command, context)  # Context isn't hashable
+
+        task_type = self._classify_cache.get(command)
+        if task_type is None:
+            task_type = self._classify_uncached(command, None)
+            if len(self._classify_cache) >= 256:
+                self._classify_cache.clear()  # Cheap cap - distinct commands are few
+            self._classify_cache[command] = task_type
+        return task_type
+
+    def _classify_uncached(self, command: str, context: Optional[Dict[str, Any]]) -> str:
+        """Score the command against every pattern set (the uncached path)"""
         if not command:
             return 'unknown'
         
@@ -130,11 +147,7 @@ class TaskClassifier:
     
     def is_task_complete(self, task_type: str, status_text: str) -> bool:
         """Check if a specific task type is complete based on status text"""
-        patterns = self.get_completion_patterns(task_type)
-        
-        status_lower = status_text.lower()
-        for pattern in patterns:
-            if pattern.lower() in status_lower:
-                return True
-        
-        return False
+        from config import Config
+
+        task_re = Config.TASK_COMPLETION_RES.get(task_type)
+        return bool(task_re and task_re.search(status_text))